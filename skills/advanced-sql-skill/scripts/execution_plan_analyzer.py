@@ -9,6 +9,11 @@ Dependencies:
 Usage:
     python execution_plan_analyzer.py --file execution_plan.sqlplan
     python execution_plan_analyzer.py --file plan.xml --threshold 10
+    python execution_plan_analyzer.py --dir plans/
+
+    Optional: the module is fully annotated and can be compiled with mypyc
+    (pip install mypy; mypyc execution_plan_analyzer.py) for a faster
+    per-operator loop - the compiled extension is imported in place of this file.
 
 Features:
     - Identifies expensive operators (>10% cost by default)
@@ -22,28 +27,102 @@ Author: Advanced SQL Skill
 Date: 2025-10-24
 """
 
+import os
 import sys
 import argparse
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Tuple, Optional
+import multiprocessing
+import lxml.etree as ET
+from typing import Any, Callable, ClassVar, Dict, List, Tuple, Optional, Union, cast
 from dataclasses import dataclass
+from functools import partial
+from operator import attrgetter
 from pathlib import Path
 
 
-@dataclass
+# SQL Server execution plan namespace and qualified (Clark notation) tag names
+NS = 'http://schemas.microsoft.com/sqlserver/2004/07/showplan'
+TAG_STMT_SIMPLE = f'{{{NS}}}StmtSimple'
+TAG_RELOP = f'{{{NS}}}RelOp'
+TAG_OBJECT = f'{{{NS}}}Object'
+TAG_WARNINGS = f'{{{NS}}}Warnings'
+TAG_MISSING_IDX_GROUP = f'{{{NS}}}MissingIndexGroup'
+TAG_MISSING_IDX = f'{{{NS}}}MissingIndex'
+TAG_NO_JOIN_PRED = f'{{{NS}}}NoJoinPredicate'
+TAG_UNMATCHED_IDX = f'{{{NS}}}UnmatchedIndexes'
+
+# Slotted dataclasses where supported (dataclass(slots=True) needs 3.10)
+_SLOTS: Dict[str, bool] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Element type for annotations (in lxml, ET.Element is a factory function, not a class)
+PlanElement = ET._Element
+PathLike = Union[str, 'os.PathLike[str]']
+
+# RelOp children that precede the physical operator element (showplan RelOpType)
+_RELOP_META_TAGS = frozenset(f'{{{NS}}}{name}' for name in (
+    'OutputList', 'Warnings', 'MemoryFractions', 'RunTimeInformation',
+    'RunTimePartitionSummary', 'InternalInfo',
+))
+
+# Removes square brackets from generated identifiers in a single pass
+_BRACKET_STRIP = str.maketrans('', '', '[]')
+
+# Warnings are recorded as (code, params) and only formatted when reported
+PlanWarning = Tuple[str, Dict[str, Any]]
+
+_WARN_TEMPLATES = {
+    'TABLE_SCAN': (
+        "🔴 TABLE SCAN on {object} ({rows:,} rows, {cost:.1f}% cost) - "
+        "Consider adding an index"
+    ),
+    'CLUSTERED_INDEX_SCAN': (
+        "🟡 CLUSTERED INDEX SCAN on {object} ({rows:,} rows, {cost:.1f}% cost) - "
+        "Consider adding a non-clustered index"
+    ),
+    'KEY_LOOKUP': (
+        "🟡 KEY LOOKUP on {object} ({rows:,} rows, {cost:.1f}% cost) - "
+        "Consider creating a covering index with INCLUDE columns"
+    ),
+    'SORT': (
+        "🟡 SORT operation on {rows:,} rows ({cost:.1f}% cost) - "
+        "Consider adding an index to avoid sorting"
+    ),
+    'HASH_MATCH': (
+        "🟡 HASH MATCH join ({rows:,} rows, {cost:.1f}% cost) - "
+        "Consider adding indexes to enable merge or nested loop joins"
+    ),
+    'IMPLICIT_CONVERSION': (
+        "🔴 IMPLICIT CONVERSION on {object} - "
+        "Prevents index usage and degrades performance"
+    ),
+    'ROW_ESTIMATION_ERROR': (
+        "🟡 ROW ESTIMATION ERROR on {object}: estimated {rows:,}, actual {actual:,} - "
+        "Update statistics or check for parameter sniffing"
+    ),
+    'NO_JOIN_PREDICATE': (
+        "🔴 NO JOIN PREDICATE - Cartesian product detected! "
+        "This will multiply all rows from both tables."
+    ),
+    'UNMATCHED_INDEXES': "🟡 UNMATCHED INDEXES - Some indexes could not be matched to query",
+}
+
+
+@dataclass(**_SLOTS)
 class OperatorInfo:
     """Information about an operator in the execution plan"""
     name: str
+    estimated_cost: float
     cost_percentage: float
     estimated_rows: int
     actual_rows: Optional[int]
     object_name: str
     index_name: str
     warnings: List[str]
-    details: Dict[str, str]
+    logical_op: str
+    estimated_cpu: float
+    estimated_io: float
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MissingIndex:
     """Information about a missing index suggestion"""
     impact: float
@@ -54,27 +133,77 @@ class MissingIndex:
     create_statement: str
 
 
+def _handle_table_scan(op: OperatorInfo) -> Optional[str]:
+    """Table Scan (full table read - very expensive)"""
+    return 'TABLE_SCAN'
+
+
+def _handle_clustered_index_scan(op: OperatorInfo) -> Optional[str]:
+    """Clustered Index Scan (reading entire index)"""
+    return 'CLUSTERED_INDEX_SCAN' if op.cost_percentage > 20 else None
+
+
+def _handle_key_lookup(op: OperatorInfo) -> Optional[str]:
+    """Key/RID Lookup (bookmark lookup - requires nested loop)"""
+    return 'KEY_LOOKUP'
+
+
+def _handle_sort(op: OperatorInfo) -> Optional[str]:
+    """Sort operator (expensive for large result sets)"""
+    return 'SORT' if op.estimated_rows > 100000 else None
+
+
+def _handle_hash_match(op: OperatorInfo) -> Optional[str]:
+    """Hash Match (expensive for large joins)"""
+    return 'HASH_MATCH' if op.cost_percentage > 25 else None
+
+
+# Physical operator name -> check returning a warning code (or None)
+_OP_HANDLERS: Dict[str, Callable[[OperatorInfo], Optional[str]]] = {
+    'Table Scan': _handle_table_scan,
+    'Clustered Index Scan': _handle_clustered_index_scan,
+    'Key Lookup': _handle_key_lookup,
+    'RID Lookup': _handle_key_lookup,
+    'Sort': _handle_sort,
+    'Hash Match': _handle_hash_match,
+}
+
+
 class ExecutionPlanAnalyzer:
     """Analyzes SQL Server execution plans (XML format)"""
 
     # SQL Server execution plan namespace
     NAMESPACES = {
-        'p': 'http://schemas.microsoft.com/sqlserver/2004/07/showplan'
+        'p': NS
     }
 
+    # XPath expressions compiled once at import and shared by every analyzer
+    # Column names of an operator's own ColumnsWithNoStatistics warning
+    _XP_NO_STATS_COLS: ClassVar[ET.XPath] = ET.XPath(
+        'p:Warnings/p:ColumnsWithNoStatistics/p:ColumnReference/@Column',
+        namespaces={'p': NS}, smart_strings=False
+    )
+    # Columns of a MissingIndex, across all of its column groups
+    _XP_MISSING_COLS: ClassVar[ET.XPath] = ET.XPath('p:ColumnGroup/p:Column', namespaces={'p': NS})
+
     def __init__(self, threshold_percentage: float = 10.0):
         self.threshold_percentage = threshold_percentage
+        self._reset()
+
+    def _reset(self) -> None:
+        """Clear the per-plan results so a reused analyzer starts each plan afresh"""
         self.expensive_operators: List[OperatorInfo] = []
         self.missing_indexes: List[MissingIndex] = []
-        self.warnings: List[str] = []
+        self.warnings: List[PlanWarning] = []
         self.total_cost: float = 0.0
+        # Set once a statement has supplied the total cost (which may itself be 0)
+        self._total_cost_found = False
 
-    def analyze_file(self, file_path: str):
-        """Analyze execution plan from file"""
+    def analyze_file(self, file_path: PathLike) -> None:
+        """Analyze execution plan from file in a single streaming pass"""
+        self._reset()
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            self.analyze_plan(root)
+            self._stream_file(file_path)
         except ET.ParseError as e:
             print(f"Error parsing XML file: {e}")
             sys.exit(1)
@@ -82,189 +211,222 @@ class ExecutionPlanAnalyzer:
             print(f"Error: File '{file_path}' not found")
             sys.exit(1)
 
-    def analyze_plan(self, root: ET.Element):
-        """Analyze execution plan XML"""
-        # Find all RelOp elements (operators)
-        self._extract_total_cost(root)
-        self._analyze_operators(root)
-        self._extract_missing_indexes(root)
-        self._extract_warnings(root)
-
-    def _extract_total_cost(self, root: ET.Element):
-        """Extract total query cost"""
-        # Look for StatementSubTreeCost
-        for stmt in root.findall('.//p:StmtSimple', self.NAMESPACES):
-            cost = stmt.get('StatementSubTreeCost')
+    def _stream_file(self, file_path: PathLike) -> None:
+        """Stream a plan file through the element handlers (raises on bad input)"""
+        # RelOps nest and their 'end' events arrive child-first, so each
+        # operator's slot is reserved at its 'start' event and filled at 'end'
+        # - the list stays in document (pre-)order, the order analyze_plan's
+        # root.iter() produces
+        operators: List[Optional[OperatorInfo]] = []
+        open_slots: List[int] = []
+        plan_warnings: List[PlanWarning] = []
+        # Hand lxml a filesystem path rather than a file object or buffer so
+        # libxml2 reads the file itself, with no intermediate Python bytes
+        context = ET.iterparse(
+            os.fspath(file_path),
+            events=('start', 'end'),
+            tag=(TAG_STMT_SIMPLE, TAG_RELOP, TAG_MISSING_IDX_GROUP, TAG_WARNINGS),
+            huge_tree=True,
+        )
+        for event, elem in context:
+            tag = elem.tag
+            if event == 'start':
+                if tag == TAG_RELOP:
+                    open_slots.append(len(operators))
+                    operators.append(None)
+                continue
+
+            if tag == TAG_RELOP:
+                operators[open_slots.pop()] = self._extract_operator_info(elem)
+            else:
+                self._handle_element(elem, plan_warnings)
+
+            if tag == TAG_RELOP or tag == TAG_MISSING_IDX_GROUP:
+                # Child operators end before their parent, so clearing here
+                # leaves the parent with only its own elements to inspect
+                elem.clear(keep_tail=True)
+            elif tag == TAG_STMT_SIMPLE:
+                # Statement fully processed - free it and any earlier statements
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+        # Every reserved slot has been filled once the document is parsed
+        self._finish_analysis(cast(List[OperatorInfo], operators), plan_warnings)
+
+    def analyze_plan(self, root: PlanElement) -> None:
+        """Analyze already-parsed execution plan XML in a single walk
+
+        Reports the same findings, in the same order, as analyze_file.
+        """
+        self._reset()
+        operators: List[OperatorInfo] = []
+        plan_warnings: List[PlanWarning] = []
+        for elem in root.iter(TAG_STMT_SIMPLE, TAG_RELOP, TAG_MISSING_IDX_GROUP, TAG_WARNINGS):
+            if elem.tag == TAG_RELOP:
+                operators.append(self._extract_operator_info(elem))
+            else:
+                self._handle_element(elem, plan_warnings)
+
+        self._finish_analysis(operators, plan_warnings)
+
+    def _handle_element(self, elem: PlanElement, plan_warnings: List[PlanWarning]) -> None:
+        """Dispatch one non-operator plan element to the matching extractor"""
+        tag = elem.tag
+        if tag == TAG_MISSING_IDX_GROUP:
+            self._extract_missing_index_group(elem)
+        elif tag == TAG_WARNINGS:
+            plan_warnings.extend(self._extract_plan_warnings(elem))
+        elif tag == TAG_STMT_SIMPLE and not self._total_cost_found:
+            # Total query cost comes from the first statement that reports one
+            cost = elem.get('StatementSubTreeCost')
             if cost:
                 self.total_cost = float(cost)
-                break
-
-    def _analyze_operators(self, root: ET.Element):
-        """Analyze all operators in the plan"""
-        for relop in root.findall('.//p:RelOp', self.NAMESPACES):
-            operator_info = self._extract_operator_info(relop)
-            if operator_info and operator_info.cost_percentage >= self.threshold_percentage:
-                self.expensive_operators.append(operator_info)
-
-            # Check for specific problem operators
-            self._check_problem_operators(relop, operator_info)
-
-    def _extract_operator_info(self, relop: ET.Element) -> Optional[OperatorInfo]:
-        """Extract information from a RelOp element"""
-        physical_op = relop.get('PhysicalOp', '')
-        estimated_cost = float(relop.get('EstimatedTotalSubtreeCost', 0))
-        estimated_rows = int(float(relop.get('EstimateRows', 0)))
-
-        # Calculate cost percentage
-        cost_percentage = 0.0
+                self._total_cost_found = True
+
+    def _finish_analysis(self, operators: List[OperatorInfo],
+                         plan_warnings: List[PlanWarning]) -> None:
+        """Score operators once the total cost is known, then add plan warnings"""
+        # Without a total cost no percentages can be computed - skip scoring and
+        # leave every operator at 0%, which only a threshold of 0 or less still
+        # admits. The cost-independent checks below (table scans, lookups,
+        # large sorts, row estimates) fire either way.
         if self.total_cost > 0:
-            cost_percentage = (estimated_cost / self.total_cost) * 100
-
-        # Extract object and index names
+            scale = 100.0 / self.total_cost
+            for operator_info in operators:
+                operator_info.cost_percentage = operator_info.estimated_cost * scale
+
+            # Keep expensive operators ordered by cost so the report needn't re-sort
+            threshold = self.threshold_percentage
+            self.expensive_operators.extend(sorted(
+                (op for op in operators if op.cost_percentage >= threshold),
+                key=attrgetter('cost_percentage'), reverse=True
+            ))
+        elif self.threshold_percentage <= 0:
+            # All tied at 0%, so plan order is already the by-cost order
+            self.expensive_operators.extend(operators)
+
+        # Check for specific problem operators
+        for operator_info in operators:
+            self._check_problem_operators(operator_info)
+
+        # Plan-level warnings are reported after operator warnings
+        self.warnings.extend(plan_warnings)
+
+    def _extract_operator_info(self, relop: PlanElement) -> OperatorInfo:
+        """Extract information from a RelOp element"""
+        # Operator, table and index names repeat across the plan - share one copy
+        _intern = sys.intern
+        # Read every attribute from one attribute view rather than separate
+        # element lookups; missing or empty values skip the float() call
+        attrib = relop.attrib
+        physical_op = _intern(attrib.get('PhysicalOp', ''))
+        cost_attr = attrib.get('EstimatedTotalSubtreeCost')
+        estimated_cost = float(cost_attr) if cost_attr else 0.0
+        rows_attr = attrib.get('EstimateRows')
+        estimated_rows = int(float(rows_attr)) if rows_attr else 0
+
+        # Extract object and index names from the physical operator element
+        # (the first child that isn't RelOp metadata) - nested operators are not searched
         object_name = ''
         index_name = ''
-        for obj in relop.findall('.//p:Object', self.NAMESPACES):
-            object_name = obj.get('Table', obj.get('Index', ''))
-            index_name = obj.get('Index', '')
-
-        # Extract warnings
-        warnings = []
-        for warning in relop.findall('.//p:Warnings', self.NAMESPACES):
-            for column in warning.findall('.//p:ColumnsWithNoStatistics', self.NAMESPACES):
-                for col in column.findall('.//p:ColumnReference', self.NAMESPACES):
-                    col_name = col.get('Column', '')
-                    warnings.append(f"No statistics on column: {col_name}")
+        for child in relop.iterchildren(ET.Element):
+            if child.tag not in _RELOP_META_TAGS:
+                obj = child.find(TAG_OBJECT)
+                if obj is not None:
+                    object_name = _intern(obj.get('Table', obj.get('Index', '')))
+                    index_name = _intern(obj.get('Index', ''))
+                break
+
+        # Extract warnings attached directly to this operator
+        warnings = [f"No statistics on column: {col_name}"
+                    for col_name in cast(List[str], ExecutionPlanAnalyzer._XP_NO_STATS_COLS(relop))]
 
         # Extract actual rows if available (from actual execution plan)
         actual_rows = None
-        actual_rows_attr = relop.get('ActualRows')
+        actual_rows_attr = attrib.get('ActualRows')
         if actual_rows_attr:
             actual_rows = int(float(actual_rows_attr))
-
-        details = {
-            'logical_op': relop.get('LogicalOp', ''),
-            'physical_op': physical_op,
-            'estimated_cost': f"{estimated_cost:.4f}",
-            'estimated_cpu': relop.get('EstimateCPU', '0'),
-            'estimated_io': relop.get('EstimateIO', '0'),
-        }
+        cpu_attr = attrib.get('EstimateCPU')
+        io_attr = attrib.get('EstimateIO')
 
         return OperatorInfo(
             name=physical_op,
-            cost_percentage=cost_percentage,
+            estimated_cost=estimated_cost,
+            cost_percentage=0.0,  # Filled in once the total cost is known
             estimated_rows=estimated_rows,
             actual_rows=actual_rows,
             object_name=object_name,
             index_name=index_name,
             warnings=warnings,
-            details=details
+            logical_op=_intern(attrib.get('LogicalOp', '')),
+            estimated_cpu=float(cpu_attr) if cpu_attr else 0.0,
+            estimated_io=float(io_attr) if io_attr else 0.0
         )
 
-    def _check_problem_operators(self, relop: ET.Element, operator_info: Optional[OperatorInfo]):
+    def _check_problem_operators(self, operator_info: OperatorInfo) -> None:
         """Check for specific problematic operators"""
-        if not operator_info:
-            return
-
-        physical_op = operator_info.name
-
-        # Table Scan (full table read - very expensive)
-        if physical_op == 'Table Scan':
-            self.warnings.append(
-                f"🔴 TABLE SCAN on {operator_info.object_name} "
-                f"({operator_info.estimated_rows:,} rows, {operator_info.cost_percentage:.1f}% cost) - "
-                f"Consider adding an index"
-            )
-
-        # Clustered Index Scan (reading entire index)
-        elif physical_op == 'Clustered Index Scan':
-            if operator_info.cost_percentage > 20:
-                self.warnings.append(
-                    f"🟡 CLUSTERED INDEX SCAN on {operator_info.object_name} "
-                    f"({operator_info.estimated_rows:,} rows, {operator_info.cost_percentage:.1f}% cost) - "
-                    f"Consider adding a non-clustered index"
-                )
-
-        # Key Lookup (bookmark lookup - requires nested loop)
-        elif physical_op == 'Key Lookup' or physical_op == 'RID Lookup':
-            self.warnings.append(
-                f"🟡 KEY LOOKUP on {operator_info.object_name} "
-                f"({operator_info.estimated_rows:,} rows, {operator_info.cost_percentage:.1f}% cost) - "
-                f"Consider creating a covering index with INCLUDE columns"
-            )
-
-        # Sort operator (expensive for large result sets)
-        elif physical_op == 'Sort':
-            if operator_info.estimated_rows > 100000:
-                self.warnings.append(
-                    f"🟡 SORT operation on {operator_info.estimated_rows:,} rows "
-                    f"({operator_info.cost_percentage:.1f}% cost) - "
-                    f"Consider adding an index to avoid sorting"
-                )
-
-        # Hash Match (expensive for large joins)
-        elif physical_op == 'Hash Match':
-            if operator_info.cost_percentage > 25:
-                self.warnings.append(
-                    f"🟡 HASH MATCH join "
-                    f"({operator_info.estimated_rows:,} rows, {operator_info.cost_percentage:.1f}% cost) - "
-                    f"Consider adding indexes to enable merge or nested loop joins"
-                )
+        params = {
+            'object': operator_info.object_name,
+            'rows': operator_info.estimated_rows,
+            'cost': operator_info.cost_percentage,
+        }
+
+        # Operator-specific checks (table scans, key lookups, sorts, ...)
+        handler = _OP_HANDLERS.get(operator_info.name)
+        if handler is not None:
+            code = handler(operator_info)
+            if code:
+                self.warnings.append((code, params))
 
         # Implicit conversion warning
         if operator_info.warnings:
             for warning in operator_info.warnings:
                 if 'CONVERT_IMPLICIT' in warning.upper():
-                    self.warnings.append(
-                        f"🔴 IMPLICIT CONVERSION on {operator_info.object_name} - "
-                        f"Prevents index usage and degrades performance"
-                    )
+                    self.warnings.append(('IMPLICIT_CONVERSION', params))
 
         # Row count estimation issues (actual vs estimated)
         if operator_info.actual_rows is not None and operator_info.estimated_rows > 0:
             ratio = operator_info.actual_rows / operator_info.estimated_rows
             if ratio > 10 or ratio < 0.1:  # 10x difference
-                self.warnings.append(
-                    f"🟡 ROW ESTIMATION ERROR on {operator_info.object_name}: "
-                    f"estimated {operator_info.estimated_rows:,}, actual {operator_info.actual_rows:,} - "
-                    f"Update statistics or check for parameter sniffing"
-                )
-
-    def _extract_missing_indexes(self, root: ET.Element):
-        """Extract missing index recommendations"""
-        for missing_idx in root.findall('.//p:MissingIndexes/p:MissingIndexGroup', self.NAMESPACES):
-            impact = float(missing_idx.get('Impact', 0))
-
-            for idx in missing_idx.findall('.//p:MissingIndex', self.NAMESPACES):
-                table = idx.get('Table', '').strip('[]')
-
-                # Extract column groups
-                equality_cols = []
-                inequality_cols = []
-                included_cols = []
-
-                for col_group in idx.findall('.//p:ColumnGroup', self.NAMESPACES):
-                    usage = col_group.get('Usage', '')
-                    columns = [col.get('Name', '').strip('[]')
-                               for col in col_group.findall('.//p:Column', self.NAMESPACES)]
-
-                    if usage == 'EQUALITY':
-                        equality_cols = columns
-                    elif usage == 'INEQUALITY':
-                        inequality_cols = columns
-                    elif usage == 'INCLUDE':
-                        included_cols = columns
-
-                # Generate CREATE INDEX statement
-                create_stmt = self._generate_create_index(table, equality_cols, inequality_cols, included_cols)
-
-                self.missing_indexes.append(MissingIndex(
-                    impact=impact,
-                    table_name=table,
-                    equality_columns=equality_cols,
-                    inequality_columns=inequality_cols,
-                    included_columns=included_cols,
-                    create_statement=create_stmt
-                ))
+                self.warnings.append(('ROW_ESTIMATION_ERROR',
+                                      dict(params, actual=operator_info.actual_rows)))
+
+    def _extract_missing_index_group(self, missing_idx: PlanElement) -> None:
+        """Extract the suggestions from one MissingIndexGroup element"""
+        impact = float(missing_idx.get('Impact', 0))
+
+        for idx in missing_idx.iterchildren(TAG_MISSING_IDX):
+            table = idx.get('Table', '').strip('[]')
+
+            # Fetch every column of every column group in one XPath call,
+            # then bucket by the owning group's Usage (only ever a lookup key,
+            # never stored, so unlike operator names it is not interned)
+            equality_cols: List[str] = []
+            inequality_cols: List[str] = []
+            included_cols: List[str] = []
+            by_usage = {
+                'EQUALITY': equality_cols,
+                'INEQUALITY': inequality_cols,
+                'INCLUDE': included_cols,
+            }
+
+            for col in cast(List[PlanElement], ExecutionPlanAnalyzer._XP_MISSING_COLS(idx)):
+                columns = by_usage.get(cast(PlanElement, col.getparent()).get('Usage', ''))
+                if columns is not None:
+                    columns.append(col.get('Name', '').strip('[]'))
+
+            # Generate CREATE INDEX statement
+            create_stmt = self._generate_create_index(table, equality_cols, inequality_cols, included_cols)
+
+            self.missing_indexes.append(MissingIndex(
+                impact=impact,
+                table_name=table,
+                equality_columns=equality_cols,
+                inequality_columns=inequality_cols,
+                included_columns=included_cols,
+                create_statement=create_stmt
+            ))
 
     def _generate_create_index(self, table: str, equality: List[str],
                                 inequality: List[str], included: List[str]) -> str:
@@ -277,7 +439,7 @@ class ExecutionPlanAnalyzer:
             table_name = table
 
         # Generate index name
-        index_name = f"IX_{table_name}_{'_'.join(equality[:3])}".replace('[', '').replace(']', '')
+        index_name = f"IX_{table_name}_{'_'.join(equality[:3])}".translate(_BRACKET_STRIP)
         if len(index_name) > 60:
             index_name = index_name[:60]
 
@@ -293,88 +455,106 @@ class ExecutionPlanAnalyzer:
 
         return f"CREATE NONCLUSTERED INDEX {index_name}\nON {table} ({key_cols_str}){include_clause};"
 
-    def _extract_warnings(self, root: ET.Element):
-        """Extract general warnings from the plan"""
-        for warning in root.findall('.//p:Warnings', self.NAMESPACES):
-            # No join predicate
-            if warning.find('.//p:NoJoinPredicate', self.NAMESPACES) is not None:
-                self.warnings.append(
-                    "🔴 NO JOIN PREDICATE - Cartesian product detected! "
-                    "This will multiply all rows from both tables."
-                )
-
-            # Unmatched indexes
-            for unmatched in warning.findall('.//p:UnmatchedIndexes', self.NAMESPACES):
-                self.warnings.append(
-                    "🟡 UNMATCHED INDEXES - Some indexes could not be matched to query"
-                )
-
-    def print_report(self):
-        """Print formatted analysis report"""
-        print("\n" + "=" * 80)
-        print("EXECUTION PLAN ANALYSIS REPORT")
-        print("=" * 80)
+    def _extract_plan_warnings(self, warning: PlanElement) -> List[PlanWarning]:
+        """Extract general warnings from one Warnings element"""
+        found: List[PlanWarning] = []
+
+        # No join predicate
+        if next(warning.iter(TAG_NO_JOIN_PRED), None) is not None:
+            found.append(('NO_JOIN_PREDICATE', {}))
+
+        # Unmatched indexes
+        for unmatched in warning.iter(TAG_UNMATCHED_IDX):
+            found.append(('UNMATCHED_INDEXES', {}))
+
+        return found
+
+    def format_report(self) -> str:
+        """Build the formatted analysis report as a single string"""
+        lines: List[str] = []
+        add = lines.append
+
+        add("\n" + "=" * 80)
+        add("EXECUTION PLAN ANALYSIS REPORT")
+        add("=" * 80)
 
         # Summary
-        print(f"\n📊 Summary:")
-        print(f"   Total Query Cost: {self.total_cost:.4f}")
-        print(f"   Expensive Operators (>{self.threshold_percentage}%): {len(self.expensive_operators)}")
-        print(f"   Missing Indexes: {len(self.missing_indexes)}")
-        print(f"   Warnings: {len(self.warnings)}")
+        add(f"\n📊 Summary:")
+        add(f"   Total Query Cost: {self.total_cost:.4f}")
+        add(f"   Expensive Operators (>{self.threshold_percentage}%): {len(self.expensive_operators)}")
+        add(f"   Missing Indexes: {len(self.missing_indexes)}")
+        add(f"   Warnings: {len(self.warnings)}")
 
         # Expensive operators
         if self.expensive_operators:
-            print(f"\n🔥 Expensive Operators (>{self.threshold_percentage}% cost):")
-            print("-" * 80)
-            for op in sorted(self.expensive_operators, key=lambda x: x.cost_percentage, reverse=True):
-                print(f"\n   Operator: {op.name}")
-                print(f"   Cost: {op.cost_percentage:.1f}%")
-                print(f"   Object: {op.object_name or 'N/A'}")
+            add(f"\n🔥 Expensive Operators (>{self.threshold_percentage}% cost):")
+            add("-" * 80)
+            for op in self.expensive_operators:
+                add(f"\n   Operator: {op.name}")
+                add(f"   Cost: {op.cost_percentage:.1f}%")
+                add(f"   Object: {op.object_name or 'N/A'}")
                 if op.index_name:
-                    print(f"   Index: {op.index_name}")
-                print(f"   Estimated Rows: {op.estimated_rows:,}")
+                    add(f"   Index: {op.index_name}")
+                add(f"   Estimated Rows: {op.estimated_rows:,}")
                 if op.actual_rows is not None:
-                    print(f"   Actual Rows: {op.actual_rows:,}")
+                    add(f"   Actual Rows: {op.actual_rows:,}")
                 if op.warnings:
                     for warning in op.warnings:
-                        print(f"   ⚠️  {warning}")
+                        add(f"   ⚠️  {warning}")
 
         # Warnings
         if self.warnings:
-            print(f"\n⚠️  Warnings and Recommendations:")
-            print("-" * 80)
-            for i, warning in enumerate(self.warnings, 1):
-                print(f"\n{i}. {warning}")
+            add(f"\n⚠️  Warnings and Recommendations:")
+            add("-" * 80)
+            for i, (code, params) in enumerate(self.warnings, 1):
+                add(f"\n{i}. {_WARN_TEMPLATES[code].format_map(params)}")
 
         # Missing indexes
         if self.missing_indexes:
-            print(f"\n📋 Missing Index Recommendations:")
-            print("-" * 80)
+            add(f"\n📋 Missing Index Recommendations:")
+            add("-" * 80)
             for i, idx in enumerate(sorted(self.missing_indexes, key=lambda x: x.impact, reverse=True), 1):
-                print(f"\n{i}. Table: {idx.table_name}")
-                print(f"   Impact: {idx.impact:.1f}%")
+                add(f"\n{i}. Table: {idx.table_name}")
+                add(f"   Impact: {idx.impact:.1f}%")
                 if idx.equality_columns:
-                    print(f"   Equality Columns: {', '.join(idx.equality_columns)}")
+                    add(f"   Equality Columns: {', '.join(idx.equality_columns)}")
                 if idx.inequality_columns:
-                    print(f"   Inequality Columns: {', '.join(idx.inequality_columns)}")
+                    add(f"   Inequality Columns: {', '.join(idx.inequality_columns)}")
                 if idx.included_columns:
-                    print(f"   Include Columns: {', '.join(idx.included_columns)}")
-                print(f"\n   Suggested Index:\n   {idx.create_statement}")
+                    add(f"   Include Columns: {', '.join(idx.included_columns)}")
+                add(f"\n   Suggested Index:\n   {idx.create_statement}")
 
         # Best practices
-        print(f"\n💡 Best Practices:")
-        print("-" * 80)
-        print("1. Focus on operators with >25% cost first")
-        print("2. Table scans and index scans indicate missing indexes")
-        print("3. Key lookups can be fixed with covering indexes (INCLUDE clause)")
-        print("4. Implicit conversions prevent index usage - match data types")
-        print("5. Large row estimation errors suggest outdated statistics")
-        print("6. Test index changes in non-production environment first")
+        add(f"\n💡 Best Practices:")
+        add("-" * 80)
+        add("1. Focus on operators with >25% cost first")
+        add("2. Table scans and index scans indicate missing indexes")
+        add("3. Key lookups can be fixed with covering indexes (INCLUDE clause)")
+        add("4. Implicit conversions prevent index usage - match data types")
+        add("5. Large row estimation errors suggest outdated statistics")
+        add("6. Test index changes in non-production environment first")
+
+        add("\n" + "=" * 80 + "\n")
+
+        return '\n'.join(lines) + '\n'
+
+    def print_report(self) -> None:
+        """Print formatted analysis report"""
+        # One write instead of a print() call per line
+        sys.stdout.write(self.format_report())
 
-        print("\n" + "=" * 80 + "\n")
 
+def _analyze_one(file_path: Path, threshold: float) -> str:
+    """Analyze one plan file and return its report (worker for --dir mode)"""
+    analyzer = ExecutionPlanAnalyzer(threshold_percentage=threshold)
+    try:
+        analyzer._stream_file(file_path)
+    except (ET.ParseError, OSError) as e:
+        return f"\nError analyzing execution plan '{file_path}': {e}\n"
+    return f"\nAnalyzing execution plan: {file_path}\n" + analyzer.format_report()
 
-def main():
+
+def main() -> None:
     parser = argparse.ArgumentParser(
         description='Analyze SQL Server execution plans for performance issues',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -382,6 +562,7 @@ def main():
 Examples:
   python execution_plan_analyzer.py --file execution_plan.sqlplan
   python execution_plan_analyzer.py --file plan.xml --threshold 5
+  python execution_plan_analyzer.py --dir query_store_exports/
 
 How to get execution plan:
   1. In SQL Server Management Studio:
@@ -399,12 +580,34 @@ How to get execution plan:
         """
     )
 
-    parser.add_argument('--file', '-f', required=True, help='Execution plan file (.sqlplan or .xml)')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--file', '-f', help='Execution plan file (.sqlplan or .xml)')
+    source.add_argument('--dir', '-d',
+                        help='Directory of execution plans (.sqlplan/.xml), analyzed in parallel')
     parser.add_argument('--threshold', '-t', type=float, default=10.0,
                         help='Cost percentage threshold for expensive operators (default: 10.0)')
 
     args = parser.parse_args()
 
+    # Analyze a directory of plans - one independent analyzer per worker process
+    if args.dir:
+        plan_dir = Path(args.dir)
+        if not plan_dir.is_dir():
+            print(f"Error: Directory '{args.dir}' not found")
+            sys.exit(1)
+
+        files = sorted(f for pattern in ('*.sqlplan', '*.xml') for f in plan_dir.glob(pattern))
+        if not files:
+            print(f"Error: No .sqlplan or .xml files found in '{args.dir}'")
+            sys.exit(1)
+
+        print(f"\nAnalyzing {len(files)} execution plans in: {args.dir}")
+        worker = partial(_analyze_one, threshold=args.threshold)
+        with multiprocessing.Pool() as pool:
+            for report in pool.imap_unordered(worker, files):
+                sys.stdout.write(report)
+        return
+
     # Validate file exists
     if not Path(args.file).exists():
         print(f"Error: File '{args.file}' not found")
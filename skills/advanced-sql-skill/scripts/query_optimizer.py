@@ -3,26 +3,115 @@
 SQL Query Optimizer - Analyzes SQL queries and suggests performance improvements
 
 Dependencies:
-    - Python 3.8+
-    - sqlparse (pip install sqlparse)
+    - Python 3.8+ (standard library only - queries are checked over a
+      single regex token pass, no SQL parser package is required)
 
 Usage:
     python query_optimizer.py --query "SELECT * FROM employees WHERE YEAR(hire_date) = 2024"
     python query_optimizer.py --file query.sql
     python query_optimizer.py --interactive
+    python query_optimizer.py --batch < queries.jsonl
 
 Author: Advanced SQL Skill
 Date: 2025-10-24
 """
 
+import os
 import re
 import sys
+import json
+import mmap
+import string
 import argparse
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from dataclasses import dataclass
-
-
-@dataclass
+from functools import lru_cache
+
+# Patterns are compiled once at import rather than looked up in the re cache on every check
+_RE_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+
+# Checks walk one token list: upper-cased words, quoted literals and single punctuation marks.
+# Every alternative consumes a run the next cannot start, so this one scan is linear and never
+# backtracks - there is no per-check regex left for a multi-pattern DFA engine to fuse
+_RE_TOKEN = re.compile(r"'[^']*'|\"[^\"]*\"|\w+|\S")
+# Same literal alternation as _RE_TOKEN, used to build the analysis cache key
+_RE_QUOTED_LITERAL = re.compile(r"'[^']*'|\"[^\"]*\"")
+
+# Functions that prevent index usage when applied to a column after WHERE
+_FUNCTION_CATEGORIES = (
+    'Date function on column',
+    'String function on column',
+    'Type conversion on column',
+    'String manipulation on column',
+)
+_FUNCTION_CATEGORY = {
+    'YEAR': _FUNCTION_CATEGORIES[0], 'MONTH': _FUNCTION_CATEGORIES[0],
+    'DAY': _FUNCTION_CATEGORIES[0], 'DATEPART': _FUNCTION_CATEGORIES[0],
+    'UPPER': _FUNCTION_CATEGORIES[1], 'LOWER': _FUNCTION_CATEGORIES[1],
+    'LTRIM': _FUNCTION_CATEGORIES[1], 'RTRIM': _FUNCTION_CATEGORIES[1], 'TRIM': _FUNCTION_CATEGORIES[1],
+    'CAST': _FUNCTION_CATEGORIES[2], 'CONVERT': _FUNCTION_CATEGORIES[2],
+    'SUBSTRING': _FUNCTION_CATEGORIES[3], 'LEFT': _FUNCTION_CATEGORIES[3], 'RIGHT': _FUNCTION_CATEGORIES[3],
+}
+# Slotted dataclasses where supported (dataclass(slots=True) needs 3.10)
+_SLOTS: Dict[str, bool] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Sort order for reported issues
+_SEVERITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+_SEVERITY_EMOJI = ('🔴', '🟡', '🟢')  # indexed by rank
+
+# Keywords that close a JOIN ... ON condition
+_JOIN_CONDITION_END = frozenset(('JOIN', 'WHERE', 'GROUP', 'HAVING', 'ORDER', 'UNION', ';'))
+
+# Index suggestions match keywords on an ASCII upper-cased copy, so no IGNORECASE
+# (translating only a-z keeps offsets aligned with the original-case text), and on
+# normalized single-line SQL, so no DOTALL
+_ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+_RE_WHERE_CLAUSE = re.compile(r'\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|$)')
+_RE_WHERE_COLUMN = re.compile(r'\b(\w+)\.(\w+)\b|\b(\w+)\s*=')
+_RE_JOIN_CLAUSE = re.compile(r'\bJOIN\b.*?\bON\b(.*?)(?:\bWHERE\b|\bJOIN\b|$)')
+_RE_QUALIFIED_COLUMN = re.compile(r'\b(\w+)\.(\w+)\b')
+
+
+def _keyword_positions(tokens: List[str], keyword: str) -> Iterator[int]:
+    """Yield every index at which keyword appears in tokens"""
+    i = -1
+    try:
+        while True:
+            i = tokens.index(keyword, i + 1)
+            yield i
+    except ValueError:
+        return
+
+
+def _contains_sequence(tokens: List[str], *sequence: str) -> bool:
+    """Check whether the tokens contain the given sequence back to back"""
+    expected = list(sequence)
+    size = len(expected)
+    return any(tokens[i:i + size] == expected for i in _keyword_positions(tokens, expected[0]))
+
+
+def _is_word(token: str) -> bool:
+    """Check whether a token is an identifier, keyword or number"""
+    return token[0].isalnum() or token[0] == '_'
+
+
+def _literal_placeholder(match) -> str:
+    """Reduce a quoted literal to the only traits the checks look at (leading % or all digits)
+
+    The original quote character is kept: a stray quote elsewhere in the query must
+    pair (or fail to pair) in the key exactly as it does in the query itself.
+    """
+    literal = match.group()
+    quote = literal[0]
+    body = literal[1:-1]
+    if body.startswith('%'):
+        return quote + '%' + quote
+    if body.isdigit():
+        return quote + '0' + quote
+    return quote + '?' + quote
+
+
+@dataclass(frozen=True, **_SLOTS)
 class OptimizationIssue:
     """Represents a performance issue found in SQL query"""
     severity: str  # 'high', 'medium', 'low'
@@ -33,52 +122,15 @@ class OptimizationIssue:
     example_fix: str = ""
 
 
-class QueryOptimizer:
-    """Analyzes SQL queries and provides optimization recommendations"""
-
-    def __init__(self):
-        self.issues: List[OptimizationIssue] = []
-
-    def analyze(self, sql_query: str) -> List[OptimizationIssue]:
-        """Main analysis function - runs all optimization checks"""
-        self.issues = []
-        sql_normalized = self._normalize_sql(sql_query)
-
-        # Run all analysis checks
-        self._check_select_star(sql_normalized, sql_query)
-        self._check_functions_on_columns(sql_normalized, sql_query)
-        self._check_leading_wildcards(sql_normalized, sql_query)
-        self._check_correlated_subqueries(sql_normalized, sql_query)
-        self._check_not_in_usage(sql_normalized, sql_query)
-        self._check_implicit_conversions(sql_normalized, sql_query)
-        self._check_or_in_joins(sql_normalized, sql_query)
-        self._check_distinct_usage(sql_normalized, sql_query)
-        self._check_union_vs_union_all(sql_normalized, sql_query)
-        self._check_cursor_usage(sql_normalized, sql_query)
-        self._check_select_top_without_order(sql_normalized, sql_query)
-
-        return sorted(self.issues, key=lambda x: {'high': 0, 'medium': 1, 'low': 2}[x.severity])
-
-    def _normalize_sql(self, sql: str) -> str:
-        """Normalize SQL for easier pattern matching"""
-        # Remove comments
-        sql = re.sub(r'--[^\n]*', '', sql)
-        sql = re.sub(r'/\*.*?\*/', '', sql, flags=re.DOTALL)
-        # Normalize whitespace
-        sql = re.sub(r'\s+', ' ', sql)
-        return sql.strip()
-
-    def _check_select_star(self, sql_normalized: str, sql_original: str):
-        """Check for SELECT * usage"""
-        pattern = r'\bSELECT\s+\*\s+FROM\b'
-        if re.search(pattern, sql_normalized, re.IGNORECASE):
-            self.issues.append(OptimizationIssue(
-                severity='medium',
-                issue_type='SELECT *',
-                description='Using SELECT * returns all columns, even those not needed',
-                location='SELECT clause',
-                suggestion='List only the columns you actually need',
-                example_fix="""
+# Issue reported by each check, built once - issues are frozen so every report shares one instance
+_ISSUE_TEMPLATES = {
+    'SELECT *': OptimizationIssue(
+        severity='medium',
+        issue_type='SELECT *',
+        description='Using SELECT * returns all columns, even those not needed',
+        location='SELECT clause',
+        suggestion='List only the columns you actually need',
+        example_fix="""
 -- Instead of:
 SELECT * FROM employees WHERE status = 'Active'
 
@@ -87,52 +139,14 @@ SELECT employee_id, first_name, last_name, email
 FROM employees
 WHERE status = 'Active'
                 """
-            ))
-
-    def _check_functions_on_columns(self, sql_normalized: str, sql_original: str):
-        """Check for functions applied to indexed columns in WHERE clause"""
-        # Common function patterns that prevent index usage
-        patterns = [
-            (r'\bWHERE.*?\b(YEAR|MONTH|DAY|DATEPART)\s*\(', 'Date function on column'),
-            (r'\bWHERE.*?\b(UPPER|LOWER|LTRIM|RTRIM|TRIM)\s*\(', 'String function on column'),
-            (r'\bWHERE.*?\b(CAST|CONVERT)\s*\(', 'Type conversion on column'),
-            (r'\bWHERE.*?\b(SUBSTRING|LEFT|RIGHT)\s*\(', 'String manipulation on column'),
-        ]
-
-        for pattern, func_type in patterns:
-            if re.search(pattern, sql_normalized, re.IGNORECASE):
-                self.issues.append(OptimizationIssue(
-                    severity='high',
-                    issue_type='Function on Indexed Column',
-                    description=f'{func_type} in WHERE clause prevents index usage',
-                    location='WHERE clause',
-                    suggestion='Rewrite to make the predicate SARGable (Search ARGument-able)',
-                    example_fix="""
--- Instead of:
-WHERE YEAR(hire_date) = 2024
-
--- Use range comparison:
-WHERE hire_date >= '2024-01-01' AND hire_date < '2025-01-01'
-
--- Instead of:
-WHERE UPPER(email) = 'JOHN@EXAMPLE.COM'
-
--- Use case-insensitive collation or computed column:
-WHERE email = 'john@example.com' COLLATE SQL_Latin1_General_CP1_CI_AS
-                    """
-                ))
-
-    def _check_leading_wildcards(self, sql_normalized: str, sql_original: str):
-        """Check for leading wildcards in LIKE predicates"""
-        pattern = r"\bLIKE\s+['\"]%"
-        if re.search(pattern, sql_normalized, re.IGNORECASE):
-            self.issues.append(OptimizationIssue(
-                severity='high',
-                issue_type='Leading Wildcard in LIKE',
-                description='Leading wildcard (LIKE \'%....\') forces full table scan',
-                location='WHERE clause',
-                suggestion='Use trailing wildcard or full-text search instead',
-                example_fix="""
+    ),
+    'Leading Wildcard in LIKE': OptimizationIssue(
+        severity='high',
+        issue_type='Leading Wildcard in LIKE',
+        description='Leading wildcard (LIKE \'%....\') forces full table scan',
+        location='WHERE clause',
+        suggestion='Use trailing wildcard or full-text search instead',
+        example_fix="""
 -- Instead of:
 WHERE last_name LIKE '%son'
 
@@ -142,20 +156,14 @@ WHERE last_name LIKE 'John%'
 -- Or use full-text search:
 WHERE CONTAINS(last_name, 'son')
                 """
-            ))
-
-    def _check_correlated_subqueries(self, sql_normalized: str, sql_original: str):
-        """Check for correlated subqueries in SELECT list (N+1 problem)"""
-        # Pattern: SELECT ..., (SELECT ... FROM ... WHERE ... = alias.column)
-        pattern = r'\bSELECT\s+.*?\(\s*SELECT\s+.*?\bFROM\b.*?\bWHERE\b.*?=\s*\w+\.\w+'
-        if re.search(pattern, sql_normalized, re.IGNORECASE | re.DOTALL):
-            self.issues.append(OptimizationIssue(
-                severity='high',
-                issue_type='Correlated Subquery in SELECT',
-                description='Subquery executes once per row (N+1 problem), causing severe performance issues',
-                location='SELECT list',
-                suggestion='Use JOINs or window functions instead',
-                example_fix="""
+    ),
+    'Correlated Subquery in SELECT': OptimizationIssue(
+        severity='high',
+        issue_type='Correlated Subquery in SELECT',
+        description='Subquery executes once per row (N+1 problem), causing severe performance issues',
+        location='SELECT list',
+        suggestion='Use JOINs or window functions instead',
+        example_fix="""
 -- Instead of:
 SELECT e.employee_id,
        (SELECT COUNT(*) FROM credentials c WHERE c.employee_id = e.employee_id)
@@ -171,19 +179,14 @@ SELECT e.employee_id, ISNULL(cc.cred_count, 0)
 FROM employees e
 LEFT JOIN CredCounts cc ON e.employee_id = cc.employee_id
                 """
-            ))
-
-    def _check_not_in_usage(self, sql_normalized: str, sql_original: str):
-        """Check for NOT IN with subqueries (NULL handling issue)"""
-        pattern = r'\bNOT\s+IN\s*\(\s*SELECT\b'
-        if re.search(pattern, sql_normalized, re.IGNORECASE):
-            self.issues.append(OptimizationIssue(
-                severity='medium',
-                issue_type='NOT IN with Subquery',
-                description='NOT IN returns no results if subquery contains NULL values',
-                location='WHERE clause',
-                suggestion='Use NOT EXISTS instead (NULL-safe)',
-                example_fix="""
+    ),
+    'NOT IN with Subquery': OptimizationIssue(
+        severity='medium',
+        issue_type='NOT IN with Subquery',
+        description='NOT IN returns no results if subquery contains NULL values',
+        location='WHERE clause',
+        suggestion='Use NOT EXISTS instead (NULL-safe)',
+        example_fix="""
 -- Instead of:
 WHERE employee_id NOT IN (SELECT manager_id FROM employees)
 
@@ -194,39 +197,28 @@ WHERE NOT EXISTS (
     WHERE e2.manager_id = employees.employee_id
 )
                 """
-            ))
-
-    def _check_implicit_conversions(self, sql_normalized: str, sql_original: str):
-        """Check for potential implicit conversions"""
-        # Look for quoted numbers (likely VARCHAR comparison with INT column)
-        pattern = r"=\s*['\"][0-9]+['\"]"
-        if re.search(pattern, sql_normalized):
-            self.issues.append(OptimizationIssue(
-                severity='medium',
-                issue_type='Potential Implicit Conversion',
-                description='Comparing numeric column to quoted number causes implicit conversion',
-                location='WHERE clause',
-                suggestion='Use correct data type (unquoted for numeric columns)',
-                example_fix="""
+    ),
+    'Potential Implicit Conversion': OptimizationIssue(
+        severity='medium',
+        issue_type='Potential Implicit Conversion',
+        description='Comparing numeric column to quoted number causes implicit conversion',
+        location='WHERE clause',
+        suggestion='Use correct data type (unquoted for numeric columns)',
+        example_fix="""
 -- Instead of:
 WHERE employee_id = '12345'  -- employee_id is INT
 
 -- Use:
 WHERE employee_id = 12345  -- Correct type, no conversion
                 """
-            ))
-
-    def _check_or_in_joins(self, sql_normalized: str, sql_original: str):
-        """Check for OR conditions in JOIN predicates"""
-        pattern = r'\bJOIN\b.*?\bON\b.*?\bOR\b'
-        if re.search(pattern, sql_normalized, re.IGNORECASE | re.DOTALL):
-            self.issues.append(OptimizationIssue(
-                severity='high',
-                issue_type='OR in JOIN Condition',
-                description='OR in JOIN prevents index usage and indicates confused logic',
-                location='JOIN clause',
-                suggestion='Use separate JOINs or UNION instead',
-                example_fix="""
+    ),
+    'OR in JOIN Condition': OptimizationIssue(
+        severity='high',
+        issue_type='OR in JOIN Condition',
+        description='OR in JOIN prevents index usage and indicates confused logic',
+        location='JOIN clause',
+        suggestion='Use separate JOINs or UNION instead',
+        example_fix="""
 -- Instead of:
 FROM employees e
 JOIN credentials c ON e.employee_id = c.employee_id
@@ -241,21 +233,14 @@ UNION ALL
 SELECT ... FROM employees e
 JOIN credentials c ON e.email = c.email_used
                 """
-            ))
-
-    def _check_distinct_usage(self, sql_normalized: str, sql_original: str):
-        """Check if DISTINCT is being used to hide duplicate problems"""
-        # DISTINCT with multiple JOINs often indicates a problem
-        if re.search(r'\bSELECT\s+DISTINCT\b', sql_normalized, re.IGNORECASE):
-            join_count = len(re.findall(r'\bJOIN\b', sql_normalized, re.IGNORECASE))
-            if join_count >= 2:
-                self.issues.append(OptimizationIssue(
-                    severity='medium',
-                    issue_type='DISTINCT with Multiple JOINs',
-                    description='DISTINCT may be hiding duplicate rows from incorrect JOINs',
-                    location='SELECT clause',
-                    suggestion='Fix the root cause instead of using DISTINCT as a band-aid',
-                    example_fix="""
+    ),
+    'DISTINCT with Multiple JOINs': OptimizationIssue(
+        severity='medium',
+        issue_type='DISTINCT with Multiple JOINs',
+        description='DISTINCT may be hiding duplicate rows from incorrect JOINs',
+        location='SELECT clause',
+        suggestion='Fix the root cause instead of using DISTINCT as a band-aid',
+        example_fix="""
 -- Review your JOINs to ensure they don't create duplicates
 -- Use window functions like ROW_NUMBER to get specific rows:
 
@@ -267,18 +252,14 @@ WITH RankedData AS (
 )
 SELECT ... FROM RankedData WHERE rn = 1
                     """
-                ))
-
-    def _check_union_vs_union_all(self, sql_normalized: str, sql_original: str):
-        """Check if UNION should be UNION ALL"""
-        if re.search(r'\bUNION\s+(?!ALL\b)', sql_normalized, re.IGNORECASE):
-            self.issues.append(OptimizationIssue(
-                severity='low',
-                issue_type='UNION without ALL',
-                description='UNION adds implicit DISTINCT operation (sorting overhead)',
-                location='UNION operator',
-                suggestion='Use UNION ALL if duplicates are impossible or acceptable',
-                example_fix="""
+    ),
+    'UNION without ALL': OptimizationIssue(
+        severity='low',
+        issue_type='UNION without ALL',
+        description='UNION adds implicit DISTINCT operation (sorting overhead)',
+        location='UNION operator',
+        suggestion='Use UNION ALL if duplicates are impossible or acceptable',
+        example_fix="""
 -- If you know there are no duplicates:
 SELECT employee_id FROM full_time_employees
 UNION ALL  -- Faster, no deduplication
@@ -286,18 +267,14 @@ SELECT employee_id FROM part_time_employees
 
 -- Only use UNION if duplicates must be removed
                 """
-            ))
-
-    def _check_cursor_usage(self, sql_normalized: str, sql_original: str):
-        """Check for cursor usage (anti-pattern for set-based operations)"""
-        if re.search(r'\bDECLARE\s+\w+\s+CURSOR\b', sql_normalized, re.IGNORECASE):
-            self.issues.append(OptimizationIssue(
-                severity='high',
-                issue_type='Cursor Usage',
-                description='Cursors process rows one at a time (10-100x slower than set-based)',
-                location='Procedure/Script',
-                suggestion='Rewrite using set-based operations',
-                example_fix="""
+    ),
+    'Cursor Usage': OptimizationIssue(
+        severity='high',
+        issue_type='Cursor Usage',
+        description='Cursors process rows one at a time (10-100x slower than set-based)',
+        location='Procedure/Script',
+        suggestion='Rewrite using set-based operations',
+        example_fix="""
 -- Instead of cursor loop:
 DECLARE @employee_id INT
 DECLARE c CURSOR FOR SELECT employee_id FROM employees
@@ -316,20 +293,14 @@ UPDATE employees
 SET salary = salary * 1.03
 WHERE status = 'Active'
                 """
-            ))
-
-    def _check_select_top_without_order(self, sql_normalized: str, sql_original: str):
-        """Check for SELECT TOP without ORDER BY (non-deterministic results)"""
-        # Pattern: SELECT TOP ... but no ORDER BY
-        if re.search(r'\bSELECT\s+TOP\s+\d+\b', sql_normalized, re.IGNORECASE):
-            if not re.search(r'\bORDER\s+BY\b', sql_normalized, re.IGNORECASE):
-                self.issues.append(OptimizationIssue(
-                    severity='low',
-                    issue_type='SELECT TOP without ORDER BY',
-                    description='SELECT TOP without ORDER BY returns non-deterministic results',
-                    location='SELECT clause',
-                    suggestion='Always use ORDER BY with TOP to get consistent results',
-                    example_fix="""
+    ),
+    'SELECT TOP without ORDER BY': OptimizationIssue(
+        severity='low',
+        issue_type='SELECT TOP without ORDER BY',
+        description='SELECT TOP without ORDER BY returns non-deterministic results',
+        location='SELECT clause',
+        suggestion='Always use ORDER BY with TOP to get consistent results',
+        example_fix="""
 -- Instead of:
 SELECT TOP 10 * FROM employees
 
@@ -338,52 +309,274 @@ SELECT TOP 10 employee_id, first_name, last_name
 FROM employees
 ORDER BY hire_date DESC  -- Explicit ordering
                     """
-                ))
+    ),
+}
 
-    def print_report(self):
-        """Print formatted optimization report"""
-        if not self.issues:
-            print("\n✓ No optimization issues found! Query looks good.")
+# One issue per function category - they share the issue type and example fix
+_FUNCTION_EXAMPLE_FIX = """
+-- Instead of:
+WHERE YEAR(hire_date) = 2024
+
+-- Use range comparison:
+WHERE hire_date >= '2024-01-01' AND hire_date < '2025-01-01'
+
+-- Instead of:
+WHERE UPPER(email) = 'JOHN@EXAMPLE.COM'
+
+-- Use case-insensitive collation or computed column:
+WHERE email = 'john@example.com' COLLATE SQL_Latin1_General_CP1_CI_AS
+                    """
+_FUNCTION_ISSUES = {
+    func_type: OptimizationIssue(
+        severity='high',
+        issue_type='Function on Indexed Column',
+        description=f'{func_type} in WHERE clause prevents index usage',
+        location='WHERE clause',
+        suggestion='Rewrite to make the predicate SARGable (Search ARGument-able)',
+        example_fix=_FUNCTION_EXAMPLE_FIX
+    )
+    for func_type in _FUNCTION_CATEGORIES
+}
+
+
+class QueryOptimizer:
+    """Analyzes SQL queries and provides optimization recommendations"""
+
+    def __init__(self):
+        self.issues: List[OptimizationIssue] = []
+        self._sql_normalized = ''
+
+    def analyze(self, sql_query: str) -> List[OptimizationIssue]:
+        """Main analysis function - runs all optimization checks"""
+        # Kept so suggest_indexes() can reuse it without normalizing again
+        self._sql_normalized = self._normalize_sql(sql_query)
+        # Queries that differ only in literal values share one cache entry
+        sql_key = _RE_QUOTED_LITERAL.sub(_literal_placeholder, self._sql_normalized)
+        found, by_severity = _analyze_normalized(sql_key)
+        self.issues = list(found)
+
+        return list(by_severity)
+
+    def _run_checks(self, sql_normalized: str):
+        """Run every optimization check against normalized SQL, collecting into self.issues"""
+        self.issues = []
+        # Upper-case and tokenize once - every check walks the same token list instead of
+        # rescanning the text
+        sql_upper = sql_normalized.upper()
+        tokens = self._tokenize(sql_upper)
+
+        # Run the analysis checks, skipping any whose keyword or punctuation is absent -
+        # a C-level substring test is far cheaper than walking the tokens
+        if '*' in sql_upper:
+            self._check_select_star(tokens)
+        if 'WHERE' in sql_upper and '(' in sql_upper:
+            self._check_functions_on_columns(tokens)
+        if '%' in sql_upper:
+            self._check_leading_wildcards(tokens)
+        if '(' in sql_upper and '.' in sql_upper:
+            self._check_correlated_subqueries(tokens)
+        if 'NOT' in sql_upper:
+            self._check_not_in_usage(tokens)
+        if "'" in sql_upper or '"' in sql_upper:
+            self._check_implicit_conversions(tokens)
+        # JOIN tokens are counted once and shared by both JOIN checks
+        join_count = tokens.count('JOIN') if 'JOIN' in sql_upper else 0
+        if join_count and 'OR' in sql_upper:
+            self._check_or_in_joins(tokens)
+        if join_count >= 2 and 'DISTINCT' in sql_upper:
+            self._check_distinct_usage(tokens, join_count)
+        if 'UNION' in sql_upper:
+            self._check_union_vs_union_all(tokens)
+        if 'CURSOR' in sql_upper:
+            self._check_cursor_usage(tokens)
+        if 'TOP' in sql_upper:
+            self._check_select_top_without_order(tokens)
+
+    def _normalize_sql(self, sql: str) -> str:
+        """Normalize SQL for easier pattern matching"""
+        # Remove both comment styles in one pass, then collapse whitespace
+        # (str.split also drops leading/trailing whitespace)
+        return ' '.join(_RE_COMMENT.sub('', sql).split())
+
+    def _tokenize(self, sql_upper: str) -> List[str]:
+        """Split upper-cased normalized SQL into words, quoted literals and punctuation"""
+        return _RE_TOKEN.findall(sql_upper)
+
+    def _check_select_star(self, tokens: List[str]):
+        """Check for SELECT * usage"""
+        if _contains_sequence(tokens, 'SELECT', '*', 'FROM'):
+            self.issues.append(_ISSUE_TEMPLATES['SELECT *'])
+
+    def _check_functions_on_columns(self, tokens: List[str]):
+        """Check for functions applied to indexed columns in WHERE clause"""
+        where_at = next(_keyword_positions(tokens, 'WHERE'), None)
+        if where_at is None:
             return
 
-        print(f"\n⚠️  Found {len(self.issues)} optimization issue(s):\n")
-        print("=" * 80)
+        # One walk from the first WHERE collects every function category called there
+        found = set()
+        for i in _keyword_positions(tokens, '('):
+            if i > where_at + 1 and tokens[i - 1] in _FUNCTION_CATEGORY:
+                found.add(_FUNCTION_CATEGORY[tokens[i - 1]])
+
+        for func_type in _FUNCTION_CATEGORIES:
+            if func_type in found:
+                self.issues.append(_FUNCTION_ISSUES[func_type])
+
+    def _check_leading_wildcards(self, tokens: List[str]):
+        """Check for leading wildcards in LIKE predicates"""
+        if any(tokens[i + 1][:2] in ("'%", '"%') for i in _keyword_positions(tokens, 'LIKE')
+               if i + 1 < len(tokens)):
+            self.issues.append(_ISSUE_TEMPLATES['Leading Wildcard in LIKE'])
+
+    def _check_correlated_subqueries(self, tokens: List[str]):
+        """Check for correlated subqueries in SELECT list (N+1 problem)"""
+        # Pattern: SELECT ..., (SELECT ... FROM ... WHERE ... = alias.column)
+        # Walked as a sequence of stages; a statement break (;) restarts the subquery search
+        stage = 0
+        found = False
+        for i, token in enumerate(tokens):
+            if stage == 0:
+                if token == 'SELECT':
+                    stage = 1
+            elif token == ';':
+                stage = 1
+            elif stage == 1:
+                if token == '(' and tokens[i + 1:i + 2] == ['SELECT']:
+                    stage = 2
+            elif stage == 2:
+                if token == 'FROM':
+                    stage = 3
+            elif stage == 3:
+                if token == 'WHERE':
+                    stage = 4
+            elif (token == '=' and i + 3 < len(tokens) and tokens[i + 2] == '.'
+                  and _is_word(tokens[i + 1]) and _is_word(tokens[i + 3])):
+                found = True
+                break
+
+        if found:
+            self.issues.append(_ISSUE_TEMPLATES['Correlated Subquery in SELECT'])
+
+    def _check_not_in_usage(self, tokens: List[str]):
+        """Check for NOT IN with subqueries (NULL handling issue)"""
+        if _contains_sequence(tokens, 'NOT', 'IN', '(', 'SELECT'):
+            self.issues.append(_ISSUE_TEMPLATES['NOT IN with Subquery'])
+
+    def _check_implicit_conversions(self, tokens: List[str]):
+        """Check for potential implicit conversions"""
+        # Look for quoted numbers (likely VARCHAR comparison with INT column)
+        if any(i + 1 < len(tokens) and tokens[i + 1][0] in '\'"' and tokens[i + 1][1:-1].isdigit()
+               for i in _keyword_positions(tokens, '=')):
+            self.issues.append(_ISSUE_TEMPLATES['Potential Implicit Conversion'])
+
+    def _check_or_in_joins(self, tokens: List[str]):
+        """Check for OR conditions in JOIN predicates"""
+        # Only an OR between ON and the end of that join's condition counts. Keywords are
+        # matched per parenthesis depth, so a WHERE or JOIN inside a derived table or
+        # subquery neither ends nor opens the enclosing join's condition. Each depth is
+        # None (no join), False (JOIN seen, ON not yet) or True (inside the ON condition)
+        join_states: List[Optional[bool]] = [None]
+        found = False
+        for token in tokens:
+            if token == '(':
+                join_states.append(None)
+            elif token == ')':
+                if len(join_states) > 1:
+                    join_states.pop()
+            elif token == 'JOIN':
+                join_states[-1] = False
+            elif token in _JOIN_CONDITION_END:
+                join_states[-1] = None
+            elif token == 'ON':
+                if join_states[-1] is False:
+                    join_states[-1] = True
+            elif token == 'OR' and True in join_states:
+                found = True
+                break
+
+        if found:
+            self.issues.append(_ISSUE_TEMPLATES['OR in JOIN Condition'])
+
+    def _check_distinct_usage(self, tokens: List[str], join_count: int):
+        """Check if DISTINCT is being used to hide duplicate problems"""
+        # DISTINCT with multiple JOINs often indicates a problem
+        if _contains_sequence(tokens, 'SELECT', 'DISTINCT'):
+            if join_count >= 2:
+                self.issues.append(_ISSUE_TEMPLATES['DISTINCT with Multiple JOINs'])
+
+    def _check_union_vs_union_all(self, tokens: List[str]):
+        """Check if UNION should be UNION ALL"""
+        if any(i + 1 < len(tokens) and tokens[i + 1] != 'ALL' for i in _keyword_positions(tokens, 'UNION')):
+            self.issues.append(_ISSUE_TEMPLATES['UNION without ALL'])
+
+    def _check_cursor_usage(self, tokens: List[str]):
+        """Check for cursor usage (anti-pattern for set-based operations)"""
+        if any(i >= 2 and tokens[i - 2] == 'DECLARE' and _is_word(tokens[i - 1])
+               for i in _keyword_positions(tokens, 'CURSOR')):
+            self.issues.append(_ISSUE_TEMPLATES['Cursor Usage'])
+
+    def _check_select_top_without_order(self, tokens: List[str]):
+        """Check for SELECT TOP without ORDER BY (non-deterministic results)"""
+        # Pattern: SELECT TOP ... but no ORDER BY
+        if any(tokens[i - 1:i] == ['SELECT'] and tokens[i + 1:i + 2] and tokens[i + 1].isdigit()
+               for i in _keyword_positions(tokens, 'TOP')):
+            if not _contains_sequence(tokens, 'ORDER', 'BY'):
+                self.issues.append(_ISSUE_TEMPLATES['SELECT TOP without ORDER BY'])
+
+    def format_report(self) -> str:
+        """Build the formatted optimization report as a single string"""
+        if not self.issues:
+            return "\n✓ No optimization issues found! Query looks good.\n"
+
+        lines: List[str] = []
+        add = lines.append
+
+        add(f"\n⚠️  Found {len(self.issues)} optimization issue(s):\n")
+        add("=" * 80)
 
         for i, issue in enumerate(self.issues, 1):
-            severity_emoji = {
-                'high': '🔴',
-                'medium': '🟡',
-                'low': '🟢'
-            }.get(issue.severity, '⚪')
+            severity_emoji = _SEVERITY_EMOJI[_SEVERITY_RANK[issue.severity]]
 
-            print(f"\n{i}. {severity_emoji} {issue.issue_type} [{issue.severity.upper()} SEVERITY]")
-            print(f"   Location: {issue.location}")
-            print(f"   Issue: {issue.description}")
-            print(f"   Suggestion: {issue.suggestion}")
+            add(f"\n{i}. {severity_emoji} {issue.issue_type} [{issue.severity.upper()} SEVERITY]")
+            add(f"   Location: {issue.location}")
+            add(f"   Issue: {issue.description}")
+            add(f"   Suggestion: {issue.suggestion}")
 
             if issue.example_fix:
-                print(f"\n   Example Fix:{issue.example_fix}")
+                add(f"\n   Example Fix:{issue.example_fix}")
+
+            add("-" * 80)
+
+        return '\n'.join(lines) + '\n'
+
+    def print_report(self):
+        """Print formatted optimization report"""
+        # One write instead of a print() call per line
+        sys.stdout.write(self.format_report())
 
-            print("-" * 80)
+    def suggest_indexes(self, sql_normalized: Optional[str] = None):
+        """Suggest potential indexes based on WHERE and JOIN clauses (defaults to the last analyzed query)"""
+        if sql_normalized is None:
+            sql_normalized = self._sql_normalized
 
-    def suggest_indexes(self, sql_normalized: str):
-        """Suggest potential indexes based on WHERE and JOIN clauses"""
         print("\n📊 Index Suggestions:")
         print("=" * 80)
 
+        # Keywords are found in the upper-cased copy; clauses are sliced from the original text
+        sql_upper = sql_normalized.translate(_ASCII_UPPER)
+
         # Extract WHERE clause columns
-        where_match = re.search(r'\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|$)',
-                                sql_normalized, re.IGNORECASE | re.DOTALL)
+        where_match = _RE_WHERE_CLAUSE.search(sql_upper)
         if where_match:
-            where_clause = where_match.group(1)
-            # Extract column references (table.column or just column)
-            columns = re.findall(r'\b(\w+)\.(\w+)\b|\b(\w+)\s*=', where_clause)
+            where_clause = sql_normalized[where_match.start(1):where_match.end(1)]
+            # Extract column references (table.column or just column), streaming the matches
             unique_cols = set()
-            for match in columns:
-                if match[0] and match[1]:  # table.column
-                    unique_cols.add(f"{match[0]}.{match[1]}")
-                elif match[2]:  # just column
-                    unique_cols.add(match[2])
+            for match in _RE_WHERE_COLUMN.finditer(where_clause):
+                if match.group(1):  # table.column - the whole match
+                    unique_cols.add(match.group())
+                else:  # just column
+                    unique_cols.add(match.group(3))
 
             if unique_cols:
                 print("\nConsider indexes on WHERE clause columns:")
@@ -391,19 +584,87 @@ ORDER BY hire_date DESC  -- Explicit ordering
                     print(f"  • {col}")
 
         # Extract JOIN columns
-        join_matches = re.findall(r'\bJOIN\b.*?\bON\b(.*?)(?:\bWHERE\b|\bJOIN\b|$)',
-                                  sql_normalized, re.IGNORECASE | re.DOTALL)
+        join_matches = [sql_normalized[m.start(1):m.end(1)] for m in _RE_JOIN_CLAUSE.finditer(sql_upper)]
         if join_matches:
             print("\nConsider indexes on JOIN columns:")
             for join_clause in join_matches:
-                columns = re.findall(r'\b(\w+)\.(\w+)\b', join_clause)
-                for table, col in columns:
-                    print(f"  • {table}.{col} (foreign key index)")
+                for match in _RE_QUALIFIED_COLUMN.finditer(join_clause):
+                    print(f"  • {match.group()} (foreign key index)")
 
         print("\nNote: These are suggestions based on query structure.")
         print("Verify with execution plans and actual query performance.\n")
 
 
+@lru_cache(maxsize=128)
+def _analyze_normalized(sql_normalized: str) -> Tuple[Tuple[OptimizationIssue, ...], Tuple[OptimizationIssue, ...]]:
+    """Cached analysis of normalized SQL - issues in check order and grouped by severity
+
+    Issues are frozen so results can be shared between callers.
+    """
+    optimizer = QueryOptimizer()
+    optimizer._run_checks(sql_normalized)
+
+    # Three severity buckets instead of a sort - check order is kept within each severity
+    buckets: Tuple[List[OptimizationIssue], ...] = ([], [], [])
+    for issue in optimizer.issues:
+        buckets[_SEVERITY_RANK[issue.severity]].append(issue)
+    return tuple(optimizer.issues), tuple(buckets[0] + buckets[1] + buckets[2])
+
+
+def _read_sql_file(file_path: str) -> str:
+    """Read a SQL file through mmap, decoding straight from the mapping without a bytes copy
+
+    Comments are left in place: _normalize_sql strips them exactly once, as for --query
+    (a second pass would turn e.g. 1-/**/-1 into a new -- line comment).
+    """
+    with open(file_path, 'rb') as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            sql = str(mapped, 'utf-8', 'replace')
+
+    # Universal newlines, as open(..., 'r') would have applied
+    if '\r' in sql:
+        sql = sql.replace('\r\n', '\n').replace('\r', '\n')
+    return sql
+
+
+def _run_batch(lines) -> None:
+    """Analyze one JSON object per line ({"sql": ..., "id": ...}), writing one JSON result per line"""
+    optimizer = QueryOptimizer()
+    write = sys.stdout.write
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            sql_query = request['sql']
+            if not isinstance(sql_query, str):
+                raise TypeError("'sql' must be a string")
+        except (ValueError, KeyError, TypeError) as e:
+            write(json.dumps({'line': line_number, 'error': f"Invalid batch line: {e}"}) + '\n')
+            continue
+
+        issues = optimizer.analyze(sql_query)
+        result = {
+            'line': line_number,
+            'issues': [
+                {
+                    'severity': issue.severity,
+                    'issue_type': issue.issue_type,
+                    'description': issue.description,
+                    'location': issue.location,
+                    'suggestion': issue.suggestion,
+                }
+                for issue in issues
+            ],
+        }
+        if 'id' in request:
+            result['id'] = request['id']
+        write(json.dumps(result) + '\n')
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Analyze SQL queries for performance optimization opportunities',
@@ -413,6 +674,7 @@ Examples:
   python query_optimizer.py --query "SELECT * FROM employees WHERE YEAR(hire_date) = 2024"
   python query_optimizer.py --file query.sql
   python query_optimizer.py --interactive
+  python query_optimizer.py --batch < queries.jsonl
         """
     )
 
@@ -422,17 +684,23 @@ Examples:
                         help='Interactive mode - paste query and press Ctrl+D (Unix) or Ctrl+Z (Windows)')
     parser.add_argument('--suggest-indexes', action='store_true',
                         help='Suggest potential indexes based on query')
+    parser.add_argument('--batch', action='store_true',
+                        help='Read one JSON object per line ({"sql": ...}) from stdin and write JSON results')
 
     args = parser.parse_args()
 
+    # Batch mode keeps one warm optimizer (and its analysis cache) for every query on stdin
+    if args.batch:
+        _run_batch(sys.stdin)
+        return
+
     # Get SQL query from appropriate source
     sql_query = None
     if args.query:
         sql_query = args.query
     elif args.file:
         try:
-            with open(args.file, 'r') as f:
-                sql_query = f.read()
+            sql_query = _read_sql_file(args.file)
         except FileNotFoundError:
             print(f"Error: File '{args.file}' not found")
             sys.exit(1)
@@ -454,7 +722,7 @@ Examples:
 
     # Optionally suggest indexes
     if args.suggest_indexes:
-        optimizer.suggest_indexes(optimizer._normalize_sql(sql_query))
+        optimizer.suggest_indexes()
 
 
 if __name__ == '__main__':
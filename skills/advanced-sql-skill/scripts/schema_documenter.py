@@ -28,12 +28,38 @@ Date: 2025-10-24
 
 import sys
 import argparse
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 from dataclasses import dataclass
+from collections import Counter, defaultdict
 from datetime import datetime
-
-
-@dataclass
+from operator import attrgetter
+
+
+# Open connections keyed by (db_type, connection_string), reused by every
+# SchemaDocumenter in the process so repeated runs skip the login handshake
+_CONN_CACHE: Dict[Tuple[str, str], Any] = {}
+
+# Slotted dataclasses where supported (dataclass(slots=True) needs 3.10)
+_SLOTS: Dict[str, bool] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Markdown labels precomputed for every flag combination, so rendering a
+# column or index row is a table lookup instead of building a list per row
+_NULLABLE_LABEL = ("No", "Yes")
+_COLUMN_KEYS_LABEL: Dict[Tuple[bool, bool], str] = {  # (is_primary_key, is_foreign_key)
+    (False, False): "",
+    (True, False): "PK",
+    (False, True): "FK",
+    (True, True): "PK, FK",
+}
+_INDEX_TYPE_LABEL: Dict[Tuple[bool, bool], str] = {  # (is_primary_key, is_unique)
+    (False, False): "NONCLUSTERED",
+    (True, False): "PK",
+    (False, True): "UNIQUE",
+    (True, True): "PK, UNIQUE",
+}
+
+
+@dataclass(frozen=True, **_SLOTS)
 class Column:
     """Database column information"""
     name: str
@@ -48,7 +74,7 @@ class Column:
     is_foreign_key: bool
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class ForeignKey:
     """Foreign key relationship"""
     name: str
@@ -58,7 +84,7 @@ class ForeignKey:
     to_column: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Index:
     """Index information"""
     name: str
@@ -70,7 +96,7 @@ class Index:
     filter_definition: Optional[str]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Table:
     """Database table information"""
     schema: str
@@ -94,9 +120,16 @@ class SchemaDocumenter:
         self.db_type = db_type
         self.conn = None
         self.tables: List[Table] = []
+        # Rows per network fetch; DB-API drivers default to 1 or 100
+        self._arraysize = 10000
 
     def connect(self):
-        """Establish database connection"""
+        """Establish database connection, reusing a cached one if available"""
+        cache_key = (self.db_type, self.connection_string)
+        self.conn = _CONN_CACHE.get(cache_key)
+        if self.conn is not None:
+            return
+
         try:
             if self.db_type == 'sqlserver':
                 import pyodbc
@@ -122,21 +155,40 @@ class SchemaDocumenter:
             print(f"Error connecting to database: {e}")
             sys.exit(1)
 
+        _CONN_CACHE[cache_key] = self.conn
+
+    def close(self):
+        """Release this documenter's connection (pooled connections stay open)"""
+        self.conn = None
+
     def extract_schema(self):
         """Extract complete schema information"""
         if not self.conn:
             self.connect()
 
         cursor = self.conn.cursor()
+        cursor.arraysize = self._arraysize
 
         # Get all tables and views
         tables_query = self._get_tables_query()
         cursor.execute(tables_query)
+        table_rows = list(self._iter_rows(cursor))
 
-        for row in cursor.fetchall():
+        # One query per metadata kind for the whole database, grouped by
+        # (schema, table), instead of four or five round-trips per table
+        columns = self._get_all_columns(cursor)
+        primary_keys = self._get_all_primary_keys(cursor)
+        foreign_keys = self._get_all_foreign_keys(cursor)
+        indexes = self._get_all_indexes(cursor)
+
+        # Get table sizes (SQL Server only for now)
+        sizes = self._get_all_table_sizes(cursor) if self.db_type == 'sqlserver' else {}
+
+        for row in table_rows:
             schema = row[0]
             table_name = row[1]
             table_type = row[2]
+            key = (schema, table_name)
 
             table = Table(
                 schema=schema,
@@ -145,34 +197,27 @@ class SchemaDocumenter:
                 row_count=None,
                 data_size_kb=None,
                 index_size_kb=None,
-                columns=[],
-                primary_key=None,
-                foreign_keys=[],
-                indexes=[],
+                columns=columns.get(key, []),
+                primary_key=primary_keys.get(key),
+                foreign_keys=foreign_keys.get(key, []),
+                indexes=indexes.get(key, []),
                 description=None
             )
 
-            # Get columns
-            table.columns = self._get_columns(schema, table_name, cursor)
-
-            # Get primary key
-            table.primary_key = self._get_primary_key(schema, table_name, cursor)
-
-            # Get foreign keys
-            table.foreign_keys = self._get_foreign_keys(schema, table_name, cursor)
-
-            # Get indexes
-            table.indexes = self._get_indexes(schema, table_name, cursor)
-
-            # Get table size (SQL Server only for now)
             if self.db_type == 'sqlserver':
                 table.row_count, table.data_size_kb, table.index_size_kb = \
-                    self._get_table_size(schema, table_name, cursor)
+                    sizes.get(key, (0, 0.0, 0.0))
 
             self.tables.append(table)
 
         cursor.close()
 
+    @staticmethod
+    def _iter_rows(cursor) -> Iterator[tuple]:
+        """Stream result rows in cursor.arraysize batches"""
+        while rows := cursor.fetchmany(cursor.arraysize):
+            yield from rows
+
     def _get_tables_query(self) -> str:
         """Get query to retrieve tables and views"""
         if self.db_type == 'sqlserver':
@@ -210,11 +255,13 @@ class SchemaDocumenter:
                 ORDER BY TABLE_SCHEMA, TABLE_NAME
             """
 
-    def _get_columns(self, schema: str, table: str, cursor) -> List[Column]:
-        """Get column information for a table"""
+    def _get_all_columns(self, cursor) -> Dict[Tuple[str, str], List[Column]]:
+        """Get column information for every table, keyed by (schema, table)"""
         if self.db_type == 'sqlserver':
             query = """
                 SELECT
+                    s.name AS schema_name,
+                    tbl.name AS table_name,
                     c.name AS column_name,
                     t.name AS data_type,
                     c.max_length,
@@ -241,59 +288,62 @@ class SchemaDocumenter:
                 ) pk ON c.object_id = pk.object_id AND c.column_id = pk.column_id
                 LEFT JOIN sys.foreign_key_columns fk ON c.object_id = fk.parent_object_id
                                                       AND c.column_id = fk.parent_column_id
-                WHERE s.name = ? AND tbl.name = ?
-                ORDER BY c.column_id
+                WHERE s.name NOT IN ('sys', 'INFORMATION_SCHEMA')
+                ORDER BY s.name, tbl.name, c.column_id
             """
-            cursor.execute(query, (schema, table))
         elif self.db_type == 'postgres':
             query = """
-                SELECT column_name, data_type, character_maximum_length,
+                SELECT table_schema, table_name,
+                       column_name, data_type, character_maximum_length,
                        numeric_precision, numeric_scale, is_nullable, column_default,
                        NULL as description, 0 as is_primary_key, 0 as is_foreign_key
                 FROM information_schema.columns
-                WHERE table_schema = %s AND table_name = %s
-                ORDER BY ordinal_position
+                WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
+                ORDER BY table_schema, table_name, ordinal_position
             """
-            cursor.execute(query, (schema, table))
+        else:
+            return {}
+        cursor.execute(query)
 
-        columns = []
-        for row in cursor.fetchall():
+        columns: Dict[Tuple[str, str], List[Column]] = defaultdict(list)
+        for row in self._iter_rows(cursor):
             col = Column(
-                name=row[0],
-                data_type=row[1],
-                max_length=row[2] if row[2] != -1 else None,
-                precision=row[3],
-                scale=row[4],
-                is_nullable=bool(row[5]),
-                default_value=row[6],
-                description=row[7],
-                is_primary_key=bool(row[8]),
-                is_foreign_key=bool(row[9])
+                name=row[2],
+                data_type=row[3],
+                max_length=row[4] if row[4] != -1 else None,
+                precision=row[5],
+                scale=row[6],
+                is_nullable=bool(row[7]),
+                default_value=row[8],
+                description=row[9],
+                is_primary_key=bool(row[10]),
+                is_foreign_key=bool(row[11])
             )
-            columns.append(col)
+            columns[(row[0], row[1])].append(col)
 
         return columns
 
-    def _get_primary_key(self, schema: str, table: str, cursor) -> Optional[str]:
-        """Get primary key name"""
+    def _get_all_primary_keys(self, cursor) -> Dict[Tuple[str, str], str]:
+        """Get primary key names, keyed by (schema, table)"""
         if self.db_type == 'sqlserver':
             query = """
-                SELECT kc.name
+                SELECT s.name, t.name, kc.name
                 FROM sys.key_constraints kc
                 INNER JOIN sys.tables t ON kc.parent_object_id = t.object_id
                 INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
-                WHERE kc.type = 'PK' AND s.name = ? AND t.name = ?
+                WHERE kc.type = 'PK'
             """
-            cursor.execute(query, (schema, table))
-            row = cursor.fetchone()
-            return row[0] if row else None
-        return None
+            cursor.execute(query)
+            return {(row[0], row[1]): row[2] for row in self._iter_rows(cursor)}
+        return {}
 
-    def _get_foreign_keys(self, schema: str, table: str, cursor) -> List[ForeignKey]:
-        """Get foreign key relationships"""
+    def _get_all_foreign_keys(self, cursor) -> Dict[Tuple[str, str], List[ForeignKey]]:
+        """Get foreign key relationships, keyed by (schema, table)"""
         if self.db_type == 'sqlserver':
             query = """
                 SELECT
+                    s.name AS schema_name,
+                    t.name AS table_name,
                     fk.name AS fk_name,
                     OBJECT_NAME(fk.parent_object_id) AS from_table,
                     COL_NAME(fkc.parent_object_id, fkc.parent_column_id) AS from_column,
@@ -303,28 +353,29 @@ class SchemaDocumenter:
                 INNER JOIN sys.foreign_key_columns fkc ON fk.object_id = fkc.constraint_object_id
                 INNER JOIN sys.tables t ON fk.parent_object_id = t.object_id
                 INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
-                WHERE s.name = ? AND t.name = ?
             """
-            cursor.execute(query, (schema, table))
+            cursor.execute(query)
 
-            fks = []
-            for row in cursor.fetchall():
+            fks: Dict[Tuple[str, str], List[ForeignKey]] = defaultdict(list)
+            for row in self._iter_rows(cursor):
                 fk = ForeignKey(
-                    name=row[0],
-                    from_table=row[1],
-                    from_column=row[2],
-                    to_table=row[3],
-                    to_column=row[4]
+                    name=row[2],
+                    from_table=row[3],
+                    from_column=row[4],
+                    to_table=row[5],
+                    to_column=row[6]
                 )
-                fks.append(fk)
+                fks[(row[0], row[1])].append(fk)
             return fks
-        return []
+        return {}
 
-    def _get_indexes(self, schema: str, table: str, cursor) -> List[Index]:
-        """Get index information"""
+    def _get_all_indexes(self, cursor) -> Dict[Tuple[str, str], List[Index]]:
+        """Get index information, keyed by (schema, table)"""
         if self.db_type == 'sqlserver':
             query = """
                 SELECT
+                    s.name AS schema_name,
+                    t.name AS table_name,
                     i.name AS index_name,
                     i.is_unique,
                     i.is_primary_key,
@@ -338,31 +389,33 @@ class SchemaDocumenter:
                 INNER JOIN sys.columns c ON ic.object_id = c.object_id AND ic.column_id = c.column_id
                 INNER JOIN sys.tables t ON i.object_id = t.object_id
                 INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
-                WHERE s.name = ? AND t.name = ? AND i.type > 0
-                GROUP BY i.name, i.is_unique, i.is_primary_key, i.filter_definition
-                ORDER BY i.name
+                WHERE i.type > 0
+                GROUP BY s.name, t.name, i.name, i.is_unique, i.is_primary_key, i.filter_definition
+                ORDER BY s.name, t.name, i.name
             """
-            cursor.execute(query, (schema, table))
+            cursor.execute(query)
 
-            indexes = []
-            for row in cursor.fetchall():
+            indexes: Dict[Tuple[str, str], List[Index]] = defaultdict(list)
+            for row in self._iter_rows(cursor):
                 idx = Index(
-                    name=row[0],
-                    table_name=table,
-                    columns=row[4].split(', ') if row[4] else [],
-                    is_unique=bool(row[1]),
-                    is_primary_key=bool(row[2]),
-                    included_columns=row[5].split(', ') if row[5] else [],
-                    filter_definition=row[3]
+                    name=row[2],
+                    table_name=row[1],
+                    columns=row[6].split(', ') if row[6] else [],
+                    is_unique=bool(row[3]),
+                    is_primary_key=bool(row[4]),
+                    included_columns=row[7].split(', ') if row[7] else [],
+                    filter_definition=row[5]
                 )
-                indexes.append(idx)
+                indexes[(row[0], row[1])].append(idx)
             return indexes
-        return []
+        return {}
 
-    def _get_table_size(self, schema: str, table: str, cursor) -> Tuple[int, float, float]:
-        """Get table size information (SQL Server only)"""
+    def _get_all_table_sizes(self, cursor) -> Dict[Tuple[str, str], Tuple[int, float, float]]:
+        """Get table size information, keyed by (schema, table) (SQL Server only)"""
         query = """
             SELECT
+                s.name AS schema_name,
+                t.name AS table_name,
                 SUM(p.rows) AS row_count,
                 SUM(a.total_pages) * 8 AS total_space_kb,
                 SUM(a.used_pages) * 8 AS data_space_kb
@@ -371,69 +424,84 @@ class SchemaDocumenter:
             INNER JOIN sys.indexes i ON t.object_id = i.object_id
             INNER JOIN sys.partitions p ON i.object_id = p.object_id AND i.index_id = p.index_id
             INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
-            WHERE s.name = ? AND t.name = ?
-            GROUP BY t.name
+            GROUP BY s.name, t.name
         """
-        cursor.execute(query, (schema, table))
-        row = cursor.fetchone()
-        if row:
-            return int(row[0] or 0), float(row[2] or 0), float((row[1] or 0) - (row[2] or 0))
-        return 0, 0.0, 0.0
+        cursor.execute(query)
+        return {
+            (row[0], row[1]): (int(row[2] or 0), float(row[4] or 0), float((row[3] or 0) - (row[4] or 0)))
+            for row in self._iter_rows(cursor)
+        }
 
     def generate_markdown(self, output_file: str, database_name: str):
         """Generate markdown documentation"""
+        tables_by_type = Counter(t.type for t in self.tables)
+        # One sort shared by the table of contents and the details section; the
+        # ER diagram and missing-index report keep the database's ORDER BY order,
+        # which follows its collation rather than code points
+        sorted_tables = sorted(self.tables, key=attrgetter('schema', 'name'))
+
+        # Build the whole document in memory and write it with one call
+        parts: List[str] = []
+        append = parts.append
+
+        # Header
+        append("# Database Schema Documentation\n\n")
+        append(f"**Database:** {database_name}\n\n")
+        append(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        append(f"**Total Tables:** {tables_by_type['TABLE']}\n\n")
+        append(f"**Total Views:** {tables_by_type['VIEW']}\n\n")
+
+        # Table of Contents
+        append("## Table of Contents\n\n")
+        for table in sorted_tables:
+            append(f"- [{table.schema}.{table.name}](#{table.schema.lower()}{table.name.lower()})\n")
+        append("\n---\n\n")
+
+        # Entity-Relationship Diagram (Mermaid)
+        append("## Entity-Relationship Diagram\n\n")
+        append("```mermaid\nerDiagram\n")
+        for table in self.tables:
+            if table.type == 'TABLE':
+                for fk in table.foreign_keys:
+                    append(f"    {fk.from_table} ||--o{{ {fk.to_table} : \"{fk.name}\"\n")
+        append("```\n\n---\n\n")
+
+        # Table Details
+        append("## Table Details\n\n")
+        for table in sorted_tables:
+            append(self._build_table_documentation(table))
+
+        # Missing Index Report
+        append(self._build_missing_index_report())
+
         with open(output_file, 'w', encoding='utf-8') as f:
-            # Header
-            f.write(f"# Database Schema Documentation\n\n")
-            f.write(f"**Database:** {database_name}\n\n")
-            f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(f"**Total Tables:** {len([t for t in self.tables if t.type == 'TABLE'])}\n\n")
-            f.write(f"**Total Views:** {len([t for t in self.tables if t.type == 'VIEW'])}\n\n")
-
-            # Table of Contents
-            f.write("## Table of Contents\n\n")
-            for table in sorted(self.tables, key=lambda x: (x.schema, x.name)):
-                f.write(f"- [{table.schema}.{table.name}](#{table.schema.lower()}{table.name.lower()})\n")
-            f.write("\n---\n\n")
-
-            # Entity-Relationship Diagram (Mermaid)
-            f.write("## Entity-Relationship Diagram\n\n")
-            f.write("```mermaid\nerDiagram\n")
-            for table in self.tables:
-                if table.type == 'TABLE':
-                    for fk in table.foreign_keys:
-                        f.write(f"    {fk.from_table} ||--o{{ {fk.to_table} : \"{fk.name}\"\n")
-            f.write("```\n\n---\n\n")
-
-            # Table Details
-            f.write("## Table Details\n\n")
-            for table in sorted(self.tables, key=lambda x: (x.schema, x.name)):
-                self._write_table_documentation(f, table)
-
-            # Missing Index Report
-            self._write_missing_index_report(f)
+            f.write(''.join(parts))
 
         print(f"\n✅ Schema documentation generated: {output_file}")
 
-    def _write_table_documentation(self, f, table: Table):
-        """Write documentation for a single table"""
-        f.write(f"### {table.schema}.{table.name}\n\n")
+    def _build_table_documentation(self, table: Table) -> str:
+        """Build documentation for a single table"""
+        parts: List[str] = []
+        append = parts.append
+
+        append(f"### {table.schema}.{table.name}\n\n")
 
         if table.description:
-            f.write(f"**Description:** {table.description}\n\n")
+            append(f"**Description:** {table.description}\n\n")
 
-        f.write(f"**Type:** {table.type}\n\n")
+        append(f"**Type:** {table.type}\n\n")
 
         if table.row_count is not None:
-            f.write(f"**Row Count:** {table.row_count:,}\n\n")
-            f.write(f"**Data Size:** {table.data_size_kb / 1024:.2f} MB\n\n")
-            f.write(f"**Index Size:** {table.index_size_kb / 1024:.2f} MB\n\n")
+            append(f"**Row Count:** {table.row_count:,}\n\n")
+            append(f"**Data Size:** {table.data_size_kb / 1024:.2f} MB\n\n")
+            append(f"**Index Size:** {table.index_size_kb / 1024:.2f} MB\n\n")
 
         # Columns
-        f.write("#### Columns\n\n")
-        f.write("| Column | Type | Nullable | Default | Description | Keys |\n")
-        f.write("|--------|------|----------|---------|-------------|------|\n")
+        append("#### Columns\n\n")
+        append("| Column | Type | Nullable | Default | Description | Keys |\n")
+        append("|--------|------|----------|---------|-------------|------|\n")
 
+        column_row = "| {} | {} | {} | {} | {} | {} |\n".format
         for col in table.columns:
             type_str = col.data_type
             if col.max_length and col.max_length > 0:
@@ -441,80 +509,73 @@ class SchemaDocumenter:
             elif col.precision:
                 type_str += f"({col.precision},{col.scale})"
 
-            nullable = "Yes" if col.is_nullable else "No"
-            default = col.default_value or ""
-            description = col.description or ""
+            append(column_row(col.name, type_str, _NULLABLE_LABEL[col.is_nullable],
+                              col.default_value or "", col.description or "",
+                              _COLUMN_KEYS_LABEL[col.is_primary_key, col.is_foreign_key]))
 
-            keys = []
-            if col.is_primary_key:
-                keys.append("PK")
-            if col.is_foreign_key:
-                keys.append("FK")
-            keys_str = ", ".join(keys)
-
-            f.write(f"| {col.name} | {type_str} | {nullable} | {default} | {description} | {keys_str} |\n")
-
-        f.write("\n")
+        append("\n")
 
         # Primary Key
         if table.primary_key:
-            f.write(f"**Primary Key:** {table.primary_key}\n\n")
+            append(f"**Primary Key:** {table.primary_key}\n\n")
 
         # Foreign Keys
         if table.foreign_keys:
-            f.write("#### Foreign Keys\n\n")
+            append("#### Foreign Keys\n\n")
             for fk in table.foreign_keys:
-                f.write(f"- **{fk.name}**: {fk.from_column} → {fk.to_table}.{fk.to_column}\n")
-            f.write("\n")
+                append(f"- **{fk.name}**: {fk.from_column} → {fk.to_table}.{fk.to_column}\n")
+            append("\n")
 
         # Indexes
         if table.indexes:
-            f.write("#### Indexes\n\n")
-            f.write("| Index Name | Type | Columns | Included Columns | Filter |\n")
-            f.write("|------------|------|---------|------------------|--------|\n")
+            append("#### Indexes\n\n")
+            append("| Index Name | Type | Columns | Included Columns | Filter |\n")
+            append("|------------|------|---------|------------------|--------|\n")
 
+            index_row = "| {} | {} | {} | {} | {} |\n".format
             for idx in table.indexes:
-                idx_type = []
-                if idx.is_primary_key:
-                    idx_type.append("PK")
-                if idx.is_unique:
-                    idx_type.append("UNIQUE")
-                if not idx_type:
-                    idx_type.append("NONCLUSTERED")
+                append(index_row(idx.name, _INDEX_TYPE_LABEL[idx.is_primary_key, idx.is_unique],
+                                 ", ".join(idx.columns), ", ".join(idx.included_columns),
+                                 idx.filter_definition or ""))
 
-                type_str = ", ".join(idx_type)
-                cols_str = ", ".join(idx.columns)
-                included_str = ", ".join(idx.included_columns) if idx.included_columns else ""
-                filter_str = idx.filter_definition or ""
+            append("\n")
 
-                f.write(f"| {idx.name} | {type_str} | {cols_str} | {included_str} | {filter_str} |\n")
+        append("---\n\n")
+        return ''.join(parts)
 
-            f.write("\n")
+    def _build_missing_index_report(self) -> str:
+        """Build report on foreign keys without indexes"""
+        parts: List[str] = []
+        append = parts.append
 
-        f.write("---\n\n")
+        append("## Missing Index Report\n\n")
+        append("Foreign keys without supporting indexes:\n\n")
 
-    def _write_missing_index_report(self, f):
-        """Write report on foreign keys without indexes"""
-        f.write("## Missing Index Report\n\n")
-        f.write("Foreign keys without supporting indexes:\n\n")
+        # Leading key column of every index per table; an FK is only
+        # supported by an index whose first key column is the FK column
+        indexed = {
+            (t.schema, t.name): {idx.columns[0] for idx in t.indexes if idx.columns}
+            for t in self.tables
+        }
 
         missing_count = 0
         for table in self.tables:
+            leading_columns = indexed[(table.schema, table.name)]
             for fk in table.foreign_keys:
-                # Check if foreign key column has an index
-                has_index = any(fk.from_column in idx.columns for idx in table.indexes)
-                if not has_index:
+                if fk.from_column not in leading_columns:
                     missing_count += 1
-                    f.write(f"- **{table.schema}.{table.name}.{fk.from_column}** (FK to {fk.to_table}.{fk.to_column})\n")
-                    f.write(f"  ```sql\n")
-                    f.write(f"  CREATE NONCLUSTERED INDEX IX_{table.name}_{fk.from_column}\n")
-                    f.write(f"  ON {table.schema}.{table.name}({fk.from_column});\n")
-                    f.write(f"  ```\n\n")
+                    append(f"- **{table.schema}.{table.name}.{fk.from_column}** (FK to {fk.to_table}.{fk.to_column})\n")
+                    append("  ```sql\n")
+                    append(f"  CREATE NONCLUSTERED INDEX IX_{table.name}_{fk.from_column}\n")
+                    append(f"  ON {table.schema}.{table.name}({fk.from_column});\n")
+                    append("  ```\n\n")
 
         if missing_count == 0:
-            f.write("✅ All foreign keys have supporting indexes!\n\n")
+            append("✅ All foreign keys have supporting indexes!\n\n")
         else:
-            f.write(f"\n⚠️  Found {missing_count} foreign key(s) without indexes.\n\n")
+            append(f"\n⚠️  Found {missing_count} foreign key(s) without indexes.\n\n")
+
+        return ''.join(parts)
 
 
 def main():